@@ -33,7 +33,7 @@ def benchmark_index_building(fasta_path):
     elapsed = time.time() - start
     
     num_seqs = len(fa.list_sequences())
-    total_bases = sum(fa.get_length(name) for name in fa.list_sequences())
+    total_bases = fa.get_total_length()
     
     print(f"Time: {elapsed:.3f} seconds")
     print(f"Sequences indexed: {num_seqs}")
@@ -0,0 +1,40 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled helpers for turning raw FASTA bytes into uppercase bases.
+
+Optional: built by setup.py when Cython is available. fastaccess.store falls
+back to bytes.translate() + bytes.upper() when this module is missing.
+"""
+
+# Byte -> uppercase byte (only ASCII a-z change, so gaps like '-' survive)
+cdef unsigned char _UPPER[256]
+for _c in range(256):
+    _UPPER[_c] = _c - 32 if 97 <= _c <= 122 else _c
+
+
+def strip_upper(const unsigned char[:] src, unsigned char[:] dst) -> Py_ssize_t:
+    """
+    Copy src into dst in one pass, dropping newline bytes and upper-casing.
+
+    Args:
+        src: Raw FASTA bytes (any read-only buffer, e.g. a slice of an mmap)
+        dst: Writable buffer at least as long as src
+
+    Returns:
+        Number of bytes written to dst
+    """
+    cdef Py_ssize_t n = src.shape[0]
+    cdef Py_ssize_t i
+    cdef Py_ssize_t j = 0
+    cdef unsigned char c
+
+    if dst.shape[0] < n:
+        raise ValueError(f"Destination buffer too small: {dst.shape[0]} < {n}")
+
+    with nogil:
+        for i in range(n):
+            c = src[i]
+            if c != 10 and c != 13:
+                dst[j] = _UPPER[c]
+                j += 1
+    return j
@@ -2,9 +2,73 @@
 High-level API for FASTA random access.
 """
 
-from typing import List, Tuple
-from .index import build_index, Index
-from .store import fetch_subseq
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union, cast
+from .index import Entry, Index, scan_index
+from .io_uring_backend import _HAS_URING, batched_pread, close_ring, open_ring
+from .store import (
+    byte_range, check_range, clean_bases, slice_span, span_function, strip_upper
+)
+
+
+# Binary cache layout:
+#   header:  magic, FASTA mtime (int64 ns), content hash (8-byte BLAKE2b of
+#            everything after the header), num_entries, names_size, descs_size
+#   columns: lengths, offsets, line_blens, line_lens, desc_starts, desc_ends
+#            (num_entries little-endian int64 each)
+#   names:   UTF-8 sequence names joined by '\n' (names never contain
+#            whitespace, so the table decodes with one decode() + split())
+#   descs:   the index's UTF-8 description arena, as is
+_CACHE_MAGIC = b'FIDX\x06'
+_CACHE_HEADER = struct.Struct('<5sxxxq8sQQQ')
+_CACHE_COLUMNS = 6
+
+
+def _byteswap_on_big_endian(column: array) -> array:
+    """Convert an int64 column between native and cache (little-endian) order."""
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+# Smallest fetch_many() batch worth submitting through io_uring
+_URING_MIN_BATCH = 8
+
+# Smallest fetch_many() batch (queries and total bases) worth spreading across
+# threads. Only used with the compiled kernel, which releases the GIL while
+# copying bases; smaller batches are faster without the hand-off.
+_THREAD_MIN_BATCH = 16
+_THREAD_MIN_BASES = 1 << 20
+_USE_THREADS = (os.cpu_count() or 1) > 1
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Get the thread pool shared by all stores, starting it on first use."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _EXECUTOR
+
+
+# Placeholder for "no sequence looked up yet" that no name can compare equal to
+_MISSING = object()
+
+# Byte translation table mapping each IUPAC base to its complement
+_RC_TABLE = bytes.maketrans(
+    b'ACGTNRYSWKMBVDHacgtnryswkmbvdh',
+    b'TGCANYRSWMKVBHDtgcanyrswmkvbhd'
+)
 
 
 class FastaStore:
@@ -38,8 +102,6 @@ class FastaStore:
             cache_dir: Optional directory for cache file. If None, uses same dir as FASTA.
                       Useful when FASTA directory is read-only.
         """
-        import os
-        
         self.path = path
         self.use_cache = use_cache
         
@@ -60,74 +122,181 @@ class FastaStore:
             self._loaded_from_cache = True
         else:
             # Build new index
-            self.index: Index = build_index(path)
+            self.index: Index = scan_index(path)
             
             # Save to cache
             if use_cache:
                 self._save_cache()
+        
+        self._reset_lookup_caches()
+        
+        # Per-thread work buffer reused by the compiled strip/upper kernel
+        self._local = threading.local()
+        
+        # Map the FASTA once; fetches slice it instead of re-opening the file
+        self._fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._ring: Optional[object] = None
+        self._ring_lock = threading.Lock()
+        self._open_mm()
+    
+    def _reset_lookup_caches(self) -> None:
+        """Reset state derived from self.index after it is (re)built."""
+        # One-element cache of the last entry looked up by fetch(), together
+        # with the span function specialized for its line geometry
+        self._last_name: object = _MISSING
+        self._last_entry: Optional[Entry] = None
+        self._last_span: Optional[Callable[[int, int, int], Tuple[int, int]]] = None
+        
+        # Sequence names, shared by every list_sequences() call
+        self._names_cache = tuple(self.index.names)
+        self._total_length = sum(self.index.lengths)
+    
+    def _open_mm(self) -> None:
+        """(Re)open the FASTA file and memory-map it read-only."""
+        self.close()
+        self._fd = os.open(self.path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        if os.fstat(self._fd).st_size > 0:
+            # Empty files cannot be mapped (and have nothing to fetch)
+            self._mm = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+    
+    def close(self) -> None:
+        """Release the memory map, file descriptor and io_uring of the FASTA file."""
+        # getattr: __del__ may run on a store whose __init__ failed early
+        ring = getattr(self, '_ring', None)
+        if ring is not None:
+            close_ring(ring)
+            self._ring = None
+        mm = getattr(self, '_mm', None)
+        if mm is not None:
+            mm.close()
+            self._mm = None
+        fd = getattr(self, '_fd', None)
+        if fd is not None:
+            os.close(fd)
+            self._fd = None
+    
+    def __enter__(self) -> 'FastaStore':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
-    def _get_fasta_mtime(self) -> float:
-        """Get modification time of FASTA file."""
-        import os
-        return os.path.getmtime(self.path)
+    def __del__(self):
+        self.close()
+    
+    def __getstate__(self) -> dict:
+        # Open handles and per-thread state cannot be pickled; the index can
+        state = self.__dict__.copy()
+        for key in ('_fd', '_mm', '_ring', '_ring_lock', '_local',
+                    '_last_name', '_last_entry', '_last_span'):
+            state.pop(key, None)
+        return state
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._reset_lookup_caches()
+        self._local = threading.local()
+        self._fd = None
+        self._mm = None
+        self._ring = None
+        self._ring_lock = threading.Lock()
+        self._open_mm()
+    
+    def _get_fasta_mtime(self) -> int:
+        """Get modification time of FASTA file in integer nanoseconds."""
+        return os.stat(self.path).st_mtime_ns
     
     def _save_cache(self) -> None:
-        """Save index to cache file."""
-        import json
-        import os
+        """Save index to binary cache file, unless it already holds the same index."""
+        names = '\n'.join(self.index.names).encode('utf-8')
+        descs = self.index.desc_arena
         
-        cache_data = {
-            'fasta_mtime': self._get_fasta_mtime(),
-            'sequences': {}
-        }
+        columns = [
+            _byteswap_on_big_endian(column) for column in (
+                self.index.lengths, self.index.offsets,
+                self.index.line_blens, self.index.line_lens,
+                self.index.desc_starts, self.index.desc_ends
+            )
+        ]
+        payload = columns + [names, descs]
         
-        for name, entry in self.index.items():
-            cache_data['sequences'][name] = {
-                'name': entry.name,
-                'description': entry.description,
-                'length': entry.length,
-                'line_blen': entry.line_blen,
-                'line_len': entry.line_len,
-                'offset': entry.offset
-            }
+        content_hash = hashlib.blake2b(digest_size=8)
+        for part in payload:
+            content_hash.update(part)
+        
+        header = _CACHE_HEADER.pack(
+            _CACHE_MAGIC, self._get_fasta_mtime(), content_hash.digest(),
+            len(self.index), len(names), len(descs)
+        )
+        size = len(header) + sum(memoryview(part).nbytes for part in payload)
+        
+        if self._cache_matches(header, size):
+            return
         
         try:
-            with open(self.cache_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            with open(self.cache_path, 'wb') as f:
+                f.write(header)
+                for part in payload:
+                    f.write(part)
         except Exception:
             # Silently fail if we can't write cache
             pass
     
+    def _cache_matches(self, header: bytes, size: int) -> bool:
+        """Check whether the cache file already has this header and size."""
+        try:
+            if os.path.getsize(self.cache_path) != size:
+                return False
+            with open(self.cache_path, 'rb') as f:
+                return f.read(len(header)) == header
+        except OSError:
+            return False
+    
     def _load_cache(self) -> bool:
         """Load index from cache file if valid. Returns True if successful."""
-        import json
-        import os
-        from .index import Entry
-        
         # Check if cache file exists
         if not os.path.exists(self.cache_path):
             return False
         
         try:
-            with open(self.cache_path, 'r') as f:
-                cache_data = json.load(f)
+            with open(self.cache_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                (magic, fasta_mtime, _, num_entries,
+                 names_size, descs_size) = _CACHE_HEADER.unpack_from(mm, 0)
+                
+                # Reject foreign formats (e.g. old JSON caches)
+                if magic != _CACHE_MAGIC:
+                    return False
+                
+                # Verify FASTA file hasn't been modified
+                if fasta_mtime != self._get_fasta_mtime():
+                    return False
+                
+                # Reject truncated files
+                column_size = num_entries * 8
+                pos = _CACHE_HEADER.size
+                if len(mm) != pos + _CACHE_COLUMNS * column_size + names_size + descs_size:
+                    return False
+                
+                columns = []
+                for _ in range(_CACHE_COLUMNS):
+                    column = array('q')
+                    column.frombytes(mm[pos:pos + column_size])
+                    columns.append(_byteswap_on_big_endian(column))
+                    pos += column_size
+                name_table = mm[pos:pos + names_size]
+                descs = mm[pos + names_size:pos + names_size + descs_size]
             
-            # Verify FASTA file hasn't been modified
-            if cache_data.get('fasta_mtime') != self._get_fasta_mtime():
+            names = name_table.decode('utf-8').split('\n') if num_entries else []
+            if len(names) != num_entries:
                 return False
             
-            # Rebuild index from cache
-            self.index = {}
-            for name, data in cache_data['sequences'].items():
-                self.index[name] = Entry(
-                    name=data['name'],
-                    description=data['description'],
-                    length=data['length'],
-                    line_blen=data['line_blen'],
-                    line_len=data['line_len'],
-                    offset=data['offset']
-                )
-            
+            lengths, offsets, line_blens, line_lens, desc_starts, desc_ends = columns
+            self.index = Index.from_arrays(
+                names, lengths, offsets, line_blens, line_lens,
+                descs, desc_starts, desc_ends
+            )
             return True
             
         except Exception:
@@ -136,9 +305,11 @@ class FastaStore:
     
     def rebuild_index(self) -> None:
         """Force rebuild of the index and update cache."""
-        self.index = build_index(self.path)
+        self.index = scan_index(self.path)
         if self.use_cache:
             self._save_cache()
+        self._reset_lookup_caches()
+        self._open_mm()
     
     def is_cached(self) -> bool:
         """Check if this instance was loaded from cache."""
@@ -146,7 +317,6 @@ class FastaStore:
     
     def cache_exists(self) -> bool:
         """Check if a cache file exists for this FASTA."""
-        import os
         return os.path.exists(self.cache_path)
     
     def get_cache_path(self) -> str:
@@ -160,7 +330,6 @@ class FastaStore:
         Returns:
             True if cache was deleted, False if it didn't exist
         """
-        import os
         if os.path.exists(self.cache_path):
             try:
                 os.remove(self.cache_path)
@@ -169,7 +338,8 @@ class FastaStore:
                 return False
         return False
     
-    def fetch(self, name: str, start: int, stop: int, reverse_complement: bool = False) -> str:
+    def fetch(self, name: str, start: int, stop: int, reverse_complement: bool = False,
+              return_bytes: bool = False) -> Union[str, bytes]:
         """
         Fetch a single subsequence using 1-based inclusive coordinates.
         
@@ -178,28 +348,54 @@ class FastaStore:
             start: Start position (1-based, inclusive)
             stop: Stop position (1-based, inclusive)
             reverse_complement: If True, return reverse complement of the sequence
+            return_bytes: If True, return ASCII bytes and skip decoding to str
             
         Returns:
-            Uppercase string containing the requested subsequence
+            Uppercase string (or bytes) containing the requested subsequence
             
         Raises:
             KeyError: If sequence name not found
             ValueError: If coordinates are invalid
         """
-        seq = fetch_subseq(self.path, self.index, name, start, stop)
+        # Repeated fetches from the same sequence skip the index lookup
+        entry = self._last_entry
+        span = self._last_span
+        if name != self._last_name or entry is None or span is None:
+            try:
+                entry = self.index[name]
+            except KeyError:
+                raise KeyError(f"Sequence '{name}' not found in index") from None
+            span = span_function(entry.line_blen, entry.line_len)
+            self._last_name = name
+            self._last_entry = entry
+            self._last_span = span
         
+        check_range(entry, start, stop)
+        byte_start, byte_end = span(entry.offset, start, stop)
+        data = self._fetch_span(entry, byte_start, byte_end)
+        
+        # Complement while still bytes, so the result is decoded only once
         if reverse_complement:
-            seq = self._reverse_complement(seq)
+            data = data.translate(_RC_TABLE)[::-1]
+        
+        if return_bytes:
+            return data
         
-        return seq
+        return data.decode('ascii', errors='ignore')
     
-    def _reverse_complement(self, seq: str) -> str:
-        """Get reverse complement of a DNA sequence."""
-        complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G',
-                     'N': 'N', 'R': 'Y', 'Y': 'R', 'S': 'S',
-                     'W': 'W', 'K': 'M', 'M': 'K', 'B': 'V',
-                     'V': 'B', 'D': 'H', 'H': 'D'}
-        return ''.join(complement.get(base, base) for base in reversed(seq))
+    def _fetch_mm(self, entry: Entry, start: int, stop: int) -> bytes:
+        """Slice a validated subsequence out of the memory-mapped FASTA."""
+        byte_start, byte_end = byte_range(entry, start, stop)
+        return self._fetch_span(entry, byte_start, byte_end)
+    
+    def _fetch_span(self, entry: Entry, byte_start: int, byte_end: int) -> bytes:
+        """Slice a byte span of a sequence out of the memory-mapped FASTA."""
+        if self._mm is None:
+            raise ValueError("I/O operation on closed FastaStore")
+        scratch = getattr(self._local, 'scratch', None)
+        if scratch is None:
+            scratch = self._local.scratch = bytearray()
+        return slice_span(self._mm, entry, byte_start, byte_end, scratch)
     
     def fetch_many(self, queries: List[Tuple[str, int, int]]) -> List[str]:
         """
@@ -215,16 +411,89 @@ class FastaStore:
             KeyError: If any sequence name not found
             ValueError: If any coordinates are invalid
         """
-        return [self.fetch(n, s, e) for (n, s, e) in queries]
+        # Validate in query order, building one Entry per distinct sequence
+        by_name: Dict[str, Entry] = {}
+        entries = []
+        for name, start, stop in queries:
+            entry = by_name.get(name)
+            if entry is None:
+                try:
+                    position = self.index.positions[name]
+                except KeyError:
+                    raise KeyError(f"Sequence '{name}' not found in index") from None
+                entry = by_name[name] = self.index.entry(position)
+            check_range(entry, start, stop)
+            entries.append(entry)
+        
+        if _HAS_URING and len(queries) >= _URING_MIN_BATCH:
+            try:
+                return self._fetch_many_uring(entries, queries)
+            except OSError:
+                # Kernel without io_uring support - use the memory map
+                pass
+        
+        if (_USE_THREADS and strip_upper is not None and len(queries) >= _THREAD_MIN_BATCH
+                and sum(stop - start + 1 for _, start, stop in queries) >= _THREAD_MIN_BASES):
+            return self._fetch_many_threaded(entries, queries)
+        
+        return self._fetch_many_mm(entries, queries)
     
-    def list_sequences(self) -> List[str]:
+    def _fetch_many_mm(self, entries: List[Entry],
+                       queries: List[Tuple[str, int, int]]) -> List[str]:
+        """Fetch validated queries from the memory map, one after another."""
+        out: List[Optional[str]] = [None] * len(queries)
+        
+        # Slice in file order so page faults walk the map forward
+        order = sorted(range(len(queries)),
+                       key=lambda i: (entries[i].offset, queries[i][1], queries[i][2]))
+        for i in order:
+            _, start, stop = queries[i]
+            out[i] = self._fetch_str(entries[i], start, stop)
+        
+        # Every query position has been filled in
+        return cast(List[str], out)
+    
+    def _fetch_many_threaded(self, entries: List[Entry],
+                             queries: List[Tuple[str, int, int]]) -> List[str]:
+        """Fetch validated queries from the memory map on the shared thread pool."""
+        starts = [start for _, start, _ in queries]
+        stops = [stop for _, _, stop in queries]
+        return list(_executor().map(self._fetch_str, entries, starts, stops))
+    
+    def _fetch_str(self, entry: Entry, start: int, stop: int) -> str:
+        """Fetch a validated subsequence from the memory map as a string."""
+        return self._fetch_mm(entry, start, stop).decode('ascii', errors='ignore')
+    
+    def _fetch_many_uring(self, entries: List[Entry],
+                          queries: List[Tuple[str, int, int]]) -> List[str]:
+        """Fetch validated queries with one batched io_uring read per query."""
+        ranges = []
+        for entry, (_, start, stop) in zip(entries, queries):
+            byte_start, byte_end = byte_range(entry, start, stop)
+            ranges.append((byte_start, byte_end - byte_start))
+        
+        if self._fd is None:
+            raise ValueError("I/O operation on closed FastaStore")
+        
+        # One ring per store, set up on first use; a ring serves one batch at a time
+        with self._ring_lock:
+            if self._ring is None:
+                self._ring = open_ring()
+            chunks = batched_pread(self._ring, self._fd, ranges)
+        return [
+            clean_bases(chunk, entry).decode('ascii', errors='ignore')
+            for chunk, entry in zip(chunks, entries)
+        ]
+    
+    def list_sequences(self) -> Sequence[str]:
         """
-        Get a list of all sequence names in the FASTA file.
+        Get all sequence names in the FASTA file.
         
         Returns:
-            List of sequence names
+            Tuple of sequence names in file order (shared between calls;
+            use list(...) for a mutable copy)
         """
-        return list(self.index.keys())
+        return self._names_cache
     
     def get_length(self, name: str) -> int:
         """
@@ -239,9 +508,19 @@ class FastaStore:
         Raises:
             KeyError: If sequence name not found
         """
-        if name not in self.index:
-            raise KeyError(f"Sequence '{name}' not found in index")
-        return self.index[name].length
+        try:
+            return self.index.lengths[self.index.positions[name]]
+        except KeyError:
+            raise KeyError(f"Sequence '{name}' not found in index") from None
+    
+    def get_total_length(self) -> int:
+        """
+        Get the combined length of all sequences.
+        
+        Returns:
+            Total number of bases in the FASTA file
+        """
+        return self._total_length
     
     def get_description(self, name: str) -> str:
         """
@@ -256,9 +535,10 @@ class FastaStore:
         Raises:
             KeyError: If sequence name not found
         """
-        if name not in self.index:
-            raise KeyError(f"Sequence '{name}' not found in index")
-        return self.index[name].description
+        try:
+            return self.index.description(self.index.positions[name])
+        except KeyError:
+            raise KeyError(f"Sequence '{name}' not found in index") from None
     
     def get_info(self, name: str) -> dict:
         """
@@ -273,9 +553,10 @@ class FastaStore:
         Raises:
             KeyError: If sequence name not found
         """
-        if name not in self.index:
-            raise KeyError(f"Sequence '{name}' not found in index")
-        entry = self.index[name]
+        try:
+            entry = self.index[name]
+        except KeyError:
+            raise KeyError(f"Sequence '{name}' not found in index") from None
         return {
             'name': entry.name,
             'description': entry.description,
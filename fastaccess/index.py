@@ -5,22 +5,139 @@ Parses FASTA files in a single pass to build an in-memory index that enables
 efficient random access to subsequences.
 """
 
+import mmap
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Iterator, List, Mapping
 
 
-@dataclass
+@dataclass(frozen=True)
 class Entry:
     """Index entry for a single FASTA record."""
+    __slots__ = ('name', 'description', 'length', 'line_blen', 'line_len', 'offset')
+    
     name: str          # Sequence name (from header)
     description: str   # Full description text after name
     length: int        # Total number of bases in the sequence
     line_blen: int     # Bases per full line; 0 if unwrapped (single line)
     line_len: int      # Bytes per line including newline(s); 0 if unwrapped
     offset: int        # Byte offset where sequence data starts
+    
+    # Frozen dataclasses with __slots__ have no __dict__ for pickle/copy to
+    # restore, and the frozen __setattr__ rejects slot-by-slot restoring
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.__slots__)
+    
+    def __setstate__(self, state: tuple) -> None:
+        for field, value in zip(self.__slots__, state):
+            object.__setattr__(self, field, value)
+
+
+class Index(Mapping[str, Entry]):
+    """
+    In-memory index of a FASTA file, stored as parallel arrays.
+    
+    Behaves like a read-only ``Dict[str, Entry]`` (entries are built on
+    access), while keeping the numeric fields in compact ``array('q')``
+    columns instead of one Python object per record. Descriptions live in
+    one UTF-8 byte arena and are only decoded when asked for.
+    
+    Attributes:
+        names: Sequence names in file order (interned)
+        positions: Sequence name -> position in the arrays
+        lengths, offsets, line_blens, line_lens: Entry fields as int64 arrays
+        desc_arena: UTF-8 bytes of all descriptions
+        desc_starts, desc_ends: Byte span of each description in desc_arena
+    """
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.lengths = array('q')
+        self.offsets = array('q')
+        self.line_blens = array('q')
+        self.line_lens = array('q')
+        self.desc_arena = bytearray()
+        self.desc_starts = array('q')
+        self.desc_ends = array('q')
+    
+    @classmethod
+    def from_arrays(cls, names: List[str], lengths: array, offsets: array,
+                    line_blens: array, line_lens: array, desc_arena: bytes,
+                    desc_starts: array, desc_ends: array) -> 'Index':
+        """Create an index from already built columns (names must be unique)."""
+        index = cls()
+        index.names = list(map(sys.intern, names))
+        index.positions = dict(zip(index.names, range(len(names))))
+        index.lengths = lengths
+        index.offsets = offsets
+        index.line_blens = line_blens
+        index.line_lens = line_lens
+        index.desc_arena = desc_arena
+        index.desc_starts = desc_starts
+        index.desc_ends = desc_ends
+        return index
+    
+    def add(self, entry: Entry) -> None:
+        """Add an entry; a repeated name replaces the earlier record."""
+        desc_start = len(self.desc_arena)
+        self.desc_arena += entry.description.encode('utf-8')
+        desc_end = len(self.desc_arena)
+        
+        i = self.positions.get(entry.name)
+        if i is None:
+            name = sys.intern(entry.name)
+            self.positions[name] = len(self.names)
+            self.names.append(name)
+            self.lengths.append(entry.length)
+            self.offsets.append(entry.offset)
+            self.line_blens.append(entry.line_blen)
+            self.line_lens.append(entry.line_len)
+            self.desc_starts.append(desc_start)
+            self.desc_ends.append(desc_end)
+        else:
+            # The replaced description stays in the arena, unreferenced
+            self.lengths[i] = entry.length
+            self.offsets[i] = entry.offset
+            self.line_blens[i] = entry.line_blen
+            self.line_lens[i] = entry.line_len
+            self.desc_starts[i] = desc_start
+            self.desc_ends[i] = desc_end
+    
+    def description(self, i: int) -> str:
+        """Decode the description stored at array position i."""
+        return self.desc_arena[self.desc_starts[i]:self.desc_ends[i]].decode('utf-8')
+    
+    def entry(self, i: int) -> Entry:
+        """Build the Entry stored at array position i."""
+        return Entry(
+            name=self.names[i],
+            description=self.description(i),
+            length=self.lengths[i],
+            line_blen=self.line_blens[i],
+            line_len=self.line_lens[i],
+            offset=self.offsets[i]
+        )
+    
+    def __getitem__(self, name: str) -> Entry:
+        return self.entry(self.positions[name])
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self.positions
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __repr__(self) -> str:
+        return f"Index({len(self)} sequences)"
 
 
-Index = Dict[str, Entry]
+# Window size used when counting newline bytes inside a record
+_SCAN_BLOCK = 1 << 20
 
 
 def build_index(path: str) -> Index:
@@ -38,9 +155,9 @@ def build_index(path: str) -> Index:
         path: Path to the FASTA file
         
     Returns:
-        Dictionary mapping sequence name to Entry with index information
+        Index mapping sequence name to Entry with index information
     """
-    index: Index = {}
+    index = Index()
     
     with open(path, 'rb') as f:
         current_name = None
@@ -59,28 +176,28 @@ def build_index(path: str) -> Index:
             if not line:
                 # End of file - save last entry if exists
                 if current_name is not None:
-                    index[current_name] = Entry(
+                    index.add(Entry(
                         name=current_name,
                         description=current_description,
                         length=current_length,
                         line_blen=current_line_blen,
                         line_len=current_line_len,
                         offset=current_offset
-                    )
+                    ))
                 break
             
             # Check if this is a header line
             if line.startswith(b'>'):
                 # Save previous entry if exists
                 if current_name is not None:
-                    index[current_name] = Entry(
+                    index.add(Entry(
                         name=current_name,
                         description=current_description,
                         length=current_length,
                         line_blen=current_line_blen,
                         line_len=current_line_len,
                         offset=current_offset
-                    )
+                    ))
                 
                 # Parse new header - extract name and description
                 header = line[1:].decode('ascii', errors='ignore').strip()
@@ -137,3 +254,90 @@ def build_index(path: str) -> Index:
                     current_length += len(bases)
     
     return index
+
+
+def scan_index(path: str) -> Index:
+    """
+    Build the same index as build_index() by scanning the file in C.
+    
+    Instead of iterating line by line in Python, the file is memory-mapped and:
+      - Record starts are located with find(b'\\n>')
+      - Line geometry is taken from the first sequence line only
+      - Base length is the record size minus its newline bytes, counted
+        in 1 MiB windows with bytes.count()
+    
+    Falls back to build_index() if the file cannot be memory-mapped.
+    
+    Args:
+        path: Path to the FASTA file
+        
+    Returns:
+        Index mapping sequence name to Entry with index information
+    """
+    index = Index()
+    
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file - nothing to index
+            return index
+        except OSError:
+            # Not mappable (e.g. a pipe) - use the line-by-line parser
+            return build_index(path)
+    
+    with mm:
+        size = len(mm)
+        
+        # Locate the first header (text before it is ignored, like build_index)
+        if mm[:1] == b'>':
+            header_start = 0
+        else:
+            header_start = mm.find(b'\n>')
+            header_start = header_start + 1 if header_start != -1 else -1
+        
+        while header_start != -1:
+            # Header line runs up to (and including) the next newline
+            header_end = mm.find(b'\n', header_start)
+            offset = header_end + 1 if header_end != -1 else size
+            
+            header = mm[header_start + 1:offset].decode('ascii', errors='ignore').strip()
+            parts = header.split(maxsplit=1)  # Split into name and rest
+            name = parts[0] if parts else header
+            description = parts[1] if len(parts) > 1 else ""
+            
+            # Sequence data runs until the next header or end of file
+            next_header = mm.find(b'\n>', offset - 1)
+            end = next_header + 1 if next_header != -1 else size
+            
+            # Line geometry from the first sequence line
+            line_blen = 0
+            line_len = 0
+            first_newline = mm.find(b'\n', offset, end)
+            if first_newline != -1 and first_newline + 1 < end:
+                # Another sequence line follows, so this record is wrapped
+                bases_end = first_newline
+                while bases_end > offset and mm[bases_end - 1] == 0x0D:
+                    bases_end -= 1
+                newline_size = 2 if bases_end < first_newline else 1
+                line_blen = bases_end - offset
+                line_len = line_blen + newline_size
+            
+            # Total bases = record bytes minus newline bytes
+            newline_bytes = 0
+            for block_start in range(offset, end, _SCAN_BLOCK):
+                block = mm[block_start:min(block_start + _SCAN_BLOCK, end)]
+                newline_bytes += block.count(b'\n') + block.count(b'\r')
+            
+            index.add(Entry(
+                name=name,
+                description=description,
+                length=end - offset - newline_bytes,
+                line_blen=line_blen,
+                line_len=line_len,
+                offset=offset
+            ))
+            
+            header_start = next_header + 1 if next_header != -1 else -1
+    
+    return index
@@ -2,20 +2,37 @@
 Random access subsequence retrieval from indexed FASTA files.
 """
 
-from .index import Index
+import mmap
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+from .index import Entry, Index
+
+try:
+    from ._kernels import strip_upper
+except ImportError:
+    # Compiled kernel not built - use bytes.translate() + bytes.upper()
+    strip_upper = None
+
+# Largest scratch buffer clean_bases() keeps for reuse; bigger spans get a
+# one-off buffer so a single huge fetch does not pin memory per thread
+_SCRATCH_MAX = 1 << 22
 
 
 def fetch_subseq(path: str, index: Index, name: str, start: int, stop: int) -> str:
     """
     Fetch a subsequence using 1-based inclusive coordinates.
     
-    For wrapped sequences:
-        - Calculate which line the start position is on
-        - Calculate byte offset within that line
-        - Read across lines, skipping newline bytes
+    See read_subseq() for details.
     
-    For unwrapped sequences:
-        - Simple seek and read operation
+    Returns:
+        Uppercase string containing the requested subsequence
+    """
+    return read_subseq(path, index, name, start, stop).decode('ascii', errors='ignore')
+
+
+def read_subseq(path: str, index: Index, name: str, start: int, stop: int) -> bytes:
+    """
+    Read a subsequence as bytes using 1-based inclusive coordinates.
     
     Args:
         path: Path to the FASTA file
@@ -25,7 +42,7 @@ def fetch_subseq(path: str, index: Index, name: str, start: int, stop: int) -> s
         stop: Stop position (1-based, inclusive)
         
     Returns:
-        Uppercase string containing the requested subsequence
+        Uppercase ASCII bytes containing the requested subsequence
         
     Raises:
         KeyError: If sequence name not found
@@ -36,70 +53,230 @@ def fetch_subseq(path: str, index: Index, name: str, start: int, stop: int) -> s
         raise KeyError(f"Sequence '{name}' not found in index")
     
     entry = index[name]
+    check_range(entry, start, stop)
+    
+    with open(path, 'rb') as f:
+        return read_range(f, entry, start, stop)
+
+
+def check_range(entry: Entry, start: int, stop: int) -> None:
+    """
+    Validate 1-based inclusive coordinates against an index entry.
     
-    # Validate coordinates
+    Raises:
+        ValueError: If coordinates are invalid
+    """
     if start < 1:
         raise ValueError(f"Start position must be >= 1, got {start}")
     if stop < start:
         raise ValueError(f"Stop position must be >= start, got start={start}, stop={stop}")
     if stop > entry.length:
         raise ValueError(
-            f"Stop position {stop} exceeds sequence length {entry.length} for '{name}'"
+            f"Stop position {stop} exceeds sequence length {entry.length} for '{entry.name}'"
         )
+
+
+def byte_range(entry: Entry, start: int, stop: int) -> Tuple[int, int]:
+    """
+    Compute the file byte span covering a validated subsequence.
+    
+    The span starts at the first requested base and ends just after the
+    last one; for wrapped sequences it includes the newline bytes between.
+    
+    Args:
+        entry: Index entry of the sequence
+        start: Start position (1-based, inclusive)
+        stop: Stop position (1-based, inclusive)
+        
+    Returns:
+        Tuple of (byte_start, byte_end) suitable for slicing
+    """
+    if entry.line_blen == 0:
+        # Unwrapped sequence - bases map directly onto bytes
+        return entry.offset + start - 1, entry.offset + stop
+    
+    first_line, first_col = divmod(start - 1, entry.line_blen)
+    last_line, last_col = divmod(stop - 1, entry.line_blen)
+    byte_start = entry.offset + first_line * entry.line_len + first_col
+    byte_end = entry.offset + last_line * entry.line_len + last_col + 1
+    return byte_start, byte_end
+
+
+def span_function(line_blen: int, line_len: int) -> Callable[[int, int, int], Tuple[int, int]]:
+    """
+    Get a byte_range() variant specialized for one line geometry.
+    
+    The returned function takes (offset, start, stop) and returns the same
+    (byte_start, byte_end) as byte_range(), with line_blen and line_len
+    compiled in as constants. Functions are generated on first use and
+    shared by every sequence with the same geometry (e.g. the common
+    60 bases / 61 bytes per line).
+    
+    Args:
+        line_blen: Bases per full line; 0 if unwrapped
+        line_len: Bytes per line including newline(s); 0 if unwrapped
+        
+    Returns:
+        Function computing the byte span of a validated subsequence
+    """
+    key = (line_blen, line_len)
+    func = _specializations.get(key)
+    if func is None:
+        template = _UNWRAPPED_SPAN if line_blen == 0 else _WRAPPED_SPAN
+        namespace: Dict[str, Any] = {}
+        exec(template.format(blen=int(line_blen), llen=int(line_len)), namespace)
+        func = _specializations[key] = namespace['span']
+    return func
+
+
+# Source templates for span_function(); {blen} and {llen} become literals
+_UNWRAPPED_SPAN = """
+def span(offset, start, stop):
+    return offset + start - 1, offset + stop
+"""
+_WRAPPED_SPAN = """
+def span(offset, start, stop):
+    start -= 1
+    stop -= 1
+    return (offset + start // {blen} * {llen} + start % {blen},
+            offset + stop // {blen} * {llen} + stop % {blen} + 1)
+"""
+
+# (line_blen, line_len) -> generated span function
+_specializations: Dict[Tuple[int, int], Callable[[int, int, int], Tuple[int, int]]] = {}
+
+
+def slice_span(buf: mmap.mmap, entry: Entry, byte_start: int, byte_end: int,
+               scratch: Optional[bytearray] = None) -> bytes:
+    """
+    Slice a byte_range() span of a sequence out of a memory-mapped FASTA file.
+    
+    Args:
+        buf: Memory map (or bytes) of the whole FASTA file
+        entry: Index entry of the sequence the span belongs to
+        byte_start: First byte of the span
+        byte_end: Byte just after the span
+        scratch: Optional reusable work buffer, see clean_bases()
+        
+    Returns:
+        Uppercase ASCII bytes containing the requested subsequence
+    """
+    if strip_upper is not None and entry.line_blen:
+        # Let the kernel read straight from the map without an extra copy
+        with memoryview(buf) as view:
+            return clean_bases(view[byte_start:byte_end], entry, scratch)
+    return clean_bases(buf[byte_start:byte_end], entry)
+
+
+def clean_bases(data: Union[bytes, memoryview], entry: Entry,
+                scratch: Optional[bytearray] = None) -> bytes:
+    """
+    Turn the raw bytes of a byte_range() span into uppercase bases.
+    
+    Uses the compiled strip_upper() kernel for wrapped sequences when it
+    is available, doing both steps in a single pass. If a scratch buffer
+    is given, the kernel writes into it (growing it in place when too
+    small, up to _SCRATCH_MAX bytes) instead of allocating a new buffer
+    per call. The returned bytes are always a fresh copy, but the scratch
+    buffer itself must not be shared between concurrent callers.
     
+    Args:
+        data: Raw file bytes (or buffer), possibly containing newline bytes
+        entry: Index entry of the sequence the bytes belong to
+        scratch: Optional reusable work buffer for the compiled kernel
+        
+    Returns:
+        Uppercase ASCII bytes with newline bytes removed
+    """
+    if not entry.line_blen:
+        # bytes() is free for bytes input and copies a memoryview
+        return bytes(data).upper()
+    if strip_upper is not None:
+        if scratch is None or len(data) > _SCRATCH_MAX:
+            out = bytearray(len(data))
+            del out[strip_upper(data, out):]
+            return bytes(out)
+        if len(scratch) < len(data):
+            # Grow-only, with headroom for slightly larger fetches
+            scratch.extend(bytes(min(2 * len(data), _SCRATCH_MAX) - len(scratch)))
+        with memoryview(scratch) as view:
+            return bytes(view[:strip_upper(data, view)])
+    return bytes(data).translate(None, b'\n\r').upper()
+
+
+def read_range(f: BinaryIO, entry: Entry, start: int, stop: int) -> bytes:
+    """
+    Read a validated subsequence from an already open FASTA file.
+    
+    For wrapped sequences:
+        - Calculate which line the start position is on
+        - Calculate byte offset within that line
+        - Read across lines, skipping newline bytes
+    
+    For unwrapped sequences:
+        - Simple seek and read operation
+    
+    Args:
+        f: FASTA file opened in binary mode
+        entry: Index entry of the sequence
+        start: Start position (1-based, inclusive)
+        stop: Stop position (1-based, inclusive)
+        
+    Returns:
+        Uppercase ASCII bytes containing the requested subsequence
+    """
     # Calculate number of bases to read
     num_bases = stop - start + 1
     
-    with open(path, 'rb') as f:
-        if entry.line_blen == 0:
-            # Unwrapped sequence - simple seek and read
-            byte_pos = entry.offset + (start - 1)
-            f.seek(byte_pos)
-            data = f.read(num_bases)
-            return data.decode('ascii', errors='ignore').upper()
-        else:
-            # Wrapped sequence - need to skip newlines
-            # Calculate starting position
-            # start-1 because we're converting from 1-based to 0-based
-            zero_based_start = start - 1
-            
-            # Which line (0-indexed) does our start position fall on?
-            blocks_before = zero_based_start // entry.line_blen
-            
-            # Position within that line
-            within_line = zero_based_start % entry.line_blen
-            
-            # Byte offset to seek to
-            byte_pos = entry.offset + blocks_before * entry.line_len + within_line
+    if entry.line_blen == 0:
+        # Unwrapped sequence - simple seek and read
+        byte_pos = entry.offset + (start - 1)
+        f.seek(byte_pos)
+        data = f.read(num_bases)
+        return data.upper()
+    else:
+        # Wrapped sequence - need to skip newlines
+        # Calculate starting position
+        # start-1 because we're converting from 1-based to 0-based
+        zero_based_start = start - 1
+        
+        # Which line (0-indexed) does our start position fall on?
+        blocks_before = zero_based_start // entry.line_blen
+        
+        # Position within that line
+        within_line = zero_based_start % entry.line_blen
+        
+        # Byte offset to seek to
+        byte_pos = entry.offset + blocks_before * entry.line_len + within_line
+        
+        f.seek(byte_pos)
+        
+        # Read bases, skipping newlines
+        result = []
+        bases_read = 0
+        bases_remaining_in_line = entry.line_blen - within_line
+        
+        while bases_read < num_bases:
+            # How many bases to read from current line?
+            to_read = min(bases_remaining_in_line, num_bases - bases_read)
             
-            f.seek(byte_pos)
+            # Read the bases
+            chunk = f.read(to_read)
+            if not chunk:
+                break
             
-            # Read bases, skipping newlines
-            result = []
-            bases_read = 0
-            bases_remaining_in_line = entry.line_blen - within_line
+            result.append(chunk)
+            bases_read += to_read
             
-            while bases_read < num_bases:
-                # How many bases to read from current line?
-                to_read = min(bases_remaining_in_line, num_bases - bases_read)
-                
-                # Read the bases
-                chunk = f.read(to_read)
-                if not chunk:
-                    break
+            # If we need more bases, skip the newline and continue
+            if bases_read < num_bases:
+                # Skip newline bytes
+                newline_size = entry.line_len - entry.line_blen
+                f.read(newline_size)
                 
-                result.append(chunk)
-                bases_read += to_read
-                
-                # If we need more bases, skip the newline and continue
-                if bases_read < num_bases:
-                    # Skip newline bytes
-                    newline_size = entry.line_len - entry.line_blen
-                    f.read(newline_size)
-                    
-                    # Next line has full line_blen bases available
-                    bases_remaining_in_line = entry.line_blen
-            
-            # Combine all chunks and return uppercase
-            combined = b''.join(result)
-            return combined.decode('ascii', errors='ignore').upper()
+                # Next line has full line_blen bases available
+                bases_remaining_in_line = entry.line_blen
+        
+        # Combine all chunks and return uppercase
+        combined = b''.join(result)
+        return combined.upper()
@@ -2,9 +2,12 @@
 Comprehensive test suite for fastaccess library.
 """
 
+import copy
 import os
+import pickle
 # Add parent directory to path for imports
 import sys
+import threading
 from pathlib import Path
 
 import pytest
@@ -12,6 +15,9 @@ import pytest
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from fastaccess.api import FastaStore
+from fastaccess import io_uring_backend
+from fastaccess import store as fa_store
+from fastaccess.index import Entry, Index, build_index, scan_index
 
 # Test fixtures paths
 TEST_DIR = Path(__file__).parent
@@ -97,6 +103,23 @@ class TestWrappedFasta:
         
         seq = self.store.fetch("seq2", 181, 240)
         assert seq == "C" * 60
+    
+    def test_reverse_complement(self, tmp_path):
+        """Test fetching the reverse complement of a subsequence."""
+        seq = self.store.fetch("seq1", 55, 65, reverse_complement=True)
+        assert seq == "ATGCAACGTAC"
+        
+        # IUPAC ambiguity codes complement too
+        path = tmp_path / "iupac.fa"
+        path.write_text(">iupac\nACGTNRY\nkmbvdh\n")
+        with FastaStore(str(path), use_cache=False) as store:
+            assert store.fetch("iupac", 1, 13, reverse_complement=True) == "DHBVKMRYNACGT"
+    
+    def test_return_bytes(self):
+        """Test fetching raw bytes instead of a string."""
+        assert self.store.fetch("seq1", 50, 70, return_bytes=True) == b"CGTACGTACGTTGCATGCATG"
+        assert self.store.fetch("seq1", 55, 65, reverse_complement=True,
+                                return_bytes=True) == b"ATGCAACGTAC"
 
 
 class TestUnwrappedFasta:
@@ -156,6 +179,124 @@ class TestWindowsFasta:
         assert "\n" not in seq
 
 
+class TestIndex:
+    """Tests for the array-backed index container."""
+    
+    def test_mapping_behaviour(self):
+        """Test that Index behaves like a dict of entries."""
+        index = Index()
+        index.add(Entry(name="a", description="first", length=10, line_blen=0, line_len=0, offset=3))
+        index.add(Entry(name="b", description="", length=20, line_blen=5, line_len=6, offset=20))
+        index.add(Entry(name="a", description="again", length=30, line_blen=0, line_len=0, offset=50))
+        
+        assert list(index) == ["a", "b"]
+        assert len(index) == 2
+        assert "b" in index and "c" not in index
+        assert index["a"] == Entry(name="a", description="again", length=30,
+                                   line_blen=0, line_len=0, offset=50)
+        assert index.lengths.tolist() == [30, 20]
+        
+        with pytest.raises(KeyError):
+            index["c"]
+    
+    def test_entry_is_frozen(self):
+        """Test that entries handed out by the index cannot be modified."""
+        entry = Entry(name="a", description="", length=1, line_blen=0, line_len=0, offset=0)
+        with pytest.raises(AttributeError):
+            entry.length = 2
+    
+    def test_entry_pickle_and_copy(self):
+        """Test that entries survive pickling, copy and deepcopy."""
+        entry = Entry(name="a", description="first", length=10, line_blen=5, line_len=6, offset=3)
+        assert pickle.loads(pickle.dumps(entry)) == entry
+        assert copy.copy(entry) == entry
+        assert copy.deepcopy(entry) == entry
+
+
+class TestScanIndex:
+    """Tests for the block-scanning index builder."""
+    
+    @pytest.mark.parametrize("path", [WRAPPED_FA, UNWRAPPED_FA, WINDOWS_FA])
+    def test_matches_build_index(self, path):
+        """Test that scan_index agrees with the line-by-line parser."""
+        assert scan_index(str(path)) == build_index(str(path))
+    
+    def test_leading_text_and_empty_record(self, tmp_path):
+        """Test text before the first header and records without sequence."""
+        path = tmp_path / "odd.fa"
+        path.write_bytes(b"junk\n>empty\n>seq desc\nACGT\nAC")
+        
+        index = scan_index(str(path))
+        assert index == build_index(str(path))
+        assert index["empty"].length == 0
+        assert index["seq"].length == 6
+        assert index["seq"].line_blen == 4
+    
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file yields an empty index."""
+        path = tmp_path / "empty.fa"
+        path.write_bytes(b"")
+        assert scan_index(str(path)) == {}
+
+
+class TestCleanBases:
+    """Tests for newline stripping and upper-casing of raw bytes."""
+    
+    RAW = b"acgT-n*\r\nACgt\n"
+    WRAPPED = Entry(name="x", description="", length=10, line_blen=7, line_len=9, offset=0)
+    
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_clean_bases(self, compiled, monkeypatch):
+        """Test that the compiled kernel and the fallback agree."""
+        if compiled and fa_store.strip_upper is None:
+            pytest.skip("compiled kernel not built")
+        if not compiled:
+            monkeypatch.setattr(fa_store, "strip_upper", None)
+        
+        assert fa_store.clean_bases(self.RAW, self.WRAPPED) == b"ACGT-N*ACGT"
+        assert fa_store.clean_bases(memoryview(self.RAW), self.WRAPPED) == b"ACGT-N*ACGT"
+        byte_start, byte_end = fa_store.byte_range(self.WRAPPED, 3, 9)
+        assert fa_store.slice_span(self.RAW, self.WRAPPED, byte_start, byte_end) == b"GT-N*AC"
+    
+    def test_scratch_buffer_reuse(self, monkeypatch):
+        """Test that results stay intact when the scratch buffer is reused."""
+        def fake_strip_upper(src, dst):
+            # Pure-Python stand-in for the compiled kernel
+            data = bytes(src).translate(None, b"\r\n").upper()
+            dst[:len(data)] = data
+            return len(data)
+        
+        monkeypatch.setattr(fa_store, "strip_upper", fake_strip_upper)
+        monkeypatch.setattr(fa_store, "_SCRATCH_MAX", 10)
+        
+        scratch = bytearray()
+        first = fa_store.clean_bases(self.RAW[:4], self.WRAPPED, scratch)
+        assert first == b"ACGT" and len(scratch) == 8
+        
+        # Spans over the cap use a one-off buffer and leave scratch alone
+        second = fa_store.clean_bases(self.RAW, self.WRAPPED, scratch)
+        assert second == b"ACGT-N*ACGT" and len(scratch) == 8
+        
+        third = fa_store.clean_bases(self.RAW[:9], self.WRAPPED, scratch)
+        assert third == b"ACGT-N*" and len(scratch) == 10
+        assert first == b"ACGT"
+
+
+class TestSpanFunctions:
+    """Tests for the generated per-geometry byte span functions."""
+    
+    @pytest.mark.parametrize("line_blen,line_len", [(0, 0), (60, 61), (60, 62), (7, 8)])
+    def test_matches_byte_range(self, line_blen, line_len):
+        """Test that specialized spans agree with the generic arithmetic."""
+        entry = Entry(name="x", description="", length=500,
+                      line_blen=line_blen, line_len=line_len, offset=13)
+        span = fa_store.span_function(line_blen, line_len)
+        assert fa_store.span_function(line_blen, line_len) is span
+        
+        for start, stop in [(1, 1), (1, 60), (55, 125), (60, 61), (499, 500)]:
+            assert span(entry.offset, start, stop) == fa_store.byte_range(entry, start, stop)
+
+
 class TestInputValidation:
     """Tests for input validation and error handling."""
     
@@ -167,6 +308,10 @@ class TestInputValidation:
         """Test that KeyError is raised for non-existent sequence."""
         with pytest.raises(KeyError, match="not found"):
             self.store.fetch("nonexistent", 1, 10)
+        
+        # Nothing has been fetched yet, so no cached lookup may match
+        with pytest.raises(KeyError, match="not found"):
+            FastaStore(str(WRAPPED_FA)).fetch(None, 1, 5)
     
     def test_start_less_than_one(self):
         """Test that ValueError is raised for start < 1."""
@@ -235,6 +380,94 @@ class TestBatchFetching:
         assert len(results[0]) == 10
         assert len(results[1]) == 51
         assert len(results[2]) == 11
+    
+    def test_fetch_many_preserves_order(self):
+        """Test that results follow query order, not file order."""
+        queries = [
+            ("seq2", 181, 240),
+            ("seq1", 61, 70),
+            ("seq2", 1, 10),
+            ("seq1", 1, 10),
+        ]
+        
+        results = self.store.fetch_many(queries)
+        assert results == [self.store.fetch(*q) for q in queries]
+        assert results[0] == "C" * 60
+        assert results[2] == "A" * 10
+    
+    def test_fetch_many_batched_reads(self, monkeypatch):
+        """Test the batched-read path against plain slicing."""
+        import fastaccess.api
+        
+        def fake_batched_pread(ring, fd, ranges):
+            return [os.pread(fd, length, offset) for offset, length in ranges]
+        
+        monkeypatch.setattr(fastaccess.api, "_HAS_URING", True)
+        monkeypatch.setattr(fastaccess.api, "open_ring", object)
+        monkeypatch.setattr(fastaccess.api, "close_ring", lambda ring: None)
+        monkeypatch.setattr(fastaccess.api, "batched_pread", fake_batched_pread)
+        
+        queries = [("seq1", i + 1, i + 70) for i in range(0, 110, 10)]
+        queries.append(("seq2", 1, 240))
+        
+        results = self.store.fetch_many(queries)
+        assert results == [self.store.fetch(*q) for q in queries]
+        self.store.close()
+    
+    @pytest.mark.skipif(not io_uring_backend._HAS_URING, reason="liburing not installed")
+    def test_batched_pread_io_uring(self):
+        """Test real io_uring reads, reusing one ring across calls."""
+        try:
+            ring = io_uring_backend.open_ring()
+        except OSError as e:
+            pytest.skip(f"io_uring unavailable: {e}")
+        
+        ranges = [(i * 7, 5 + i) for i in range(io_uring_backend.BATCH_SIZE + 3)]
+        fd = os.open(str(WRAPPED_FA), os.O_RDONLY)
+        try:
+            for _ in range(2):
+                chunks = io_uring_backend.batched_pread(ring, fd, ranges)
+                assert chunks == [os.pread(fd, length, offset) for offset, length in ranges]
+        finally:
+            io_uring_backend.close_ring(ring)
+            os.close(fd)
+        
+        queries = [("seq1", i + 1, i + 70) for i in range(0, 110, 10)]
+        results = self.store.fetch_many(queries)
+        assert results == [self.store.fetch(*q) for q in queries]
+        assert self.store.fetch_many(queries) == results
+    
+    def test_fetch_many_large_batch(self, monkeypatch):
+        """Test a batch large enough to be spread across threads."""
+        import fastaccess.api
+        threads = set()
+        
+        def fake_strip_upper(src, dst):
+            # Pure-Python stand-in for the compiled kernel, which gates threading
+            threads.add(threading.get_ident())
+            data = bytes(src).translate(None, b"\r\n").upper()
+            dst[:len(data)] = data
+            return len(data)
+        
+        monkeypatch.setattr(fastaccess.api, "_HAS_URING", False)
+        monkeypatch.setattr(fastaccess.api, "_USE_THREADS", True)
+        monkeypatch.setattr(fastaccess.api, "_THREAD_MIN_BASES", 0)
+        monkeypatch.setattr(fastaccess.api, "strip_upper", fake_strip_upper)
+        monkeypatch.setattr(fa_store, "strip_upper", fake_strip_upper)
+        
+        queries = [("seq1" if i % 2 else "seq2", i + 1, i + 100) for i in range(64)]
+        
+        results = self.store.fetch_many(queries)
+        assert threads and threading.get_ident() not in threads
+        assert results == [self.store.fetch(*q) for q in queries]
+    
+    def test_fetch_many_invalid_query(self):
+        """Test that an invalid query raises before anything is read."""
+        with pytest.raises(KeyError, match="not found"):
+            self.store.fetch_many([("seq1", 1, 10), ("nonexistent", 1, 10)])
+        
+        with pytest.raises(ValueError, match="exceeds sequence length"):
+            self.store.fetch_many([("seq1", 1, 10), ("seq1", 1, 200)])
 
 
 class TestAPIHelpers:
@@ -250,6 +483,8 @@ class TestAPIHelpers:
         assert "seq1" in names
         assert "seq2" in names
         assert len(names) == 2
+        assert names == ("seq1", "seq2")
+        assert self.store.list_sequences() is names
     
     def test_get_length(self):
         """Test getting sequence lengths."""
@@ -258,6 +493,99 @@ class TestAPIHelpers:
         
         with pytest.raises(KeyError):
             self.store.get_length("nonexistent")
+    
+    def test_get_total_length(self):
+        """Test the combined length of all sequences."""
+        assert self.store.get_total_length() == 180 + 240
+    
+    def test_unknown_name_errors(self):
+        """Test that every accessor reports unknown names the same way."""
+        for accessor in (self.store.get_length, self.store.get_description, self.store.get_info):
+            with pytest.raises(KeyError, match="not found in index"):
+                accessor("nonexistent")
+    
+    def test_rebuild_index_resets_lookup_cache(self, tmp_path):
+        """Test that fetch() does not reuse a stale entry after rebuild_index()."""
+        path = tmp_path / "grow.fa"
+        path.write_text(">s\nACGT\n")
+        store = FastaStore(str(path), use_cache=False)
+        assert store.fetch("s", 1, 4) == "ACGT"
+        
+        path.write_text(">s\nTTTTGGGG\n")
+        store.rebuild_index()
+        assert store.fetch("s", 5, 8) == "GGGG"
+        store.close()
+    
+    def test_context_manager(self):
+        """Test that the store can be used as a context manager and closed."""
+        with FastaStore(str(WRAPPED_FA)) as store:
+            assert store.fetch("seq1", 1, 4) == "ACGT"
+        assert store._mm is None
+        store.close()  # Closing twice is harmless
+        
+        with pytest.raises(ValueError, match="closed FastaStore"):
+            store.fetch("seq1", 1, 4)
+        with pytest.raises(ValueError, match="closed FastaStore"):
+            store.fetch_many([("seq1", 1, 4)])
+    
+    def test_pickle_roundtrip(self):
+        """Test that a pickled store reopens its FASTA file."""
+        self.store.fetch("seq1", 1, 4)
+        clone = pickle.loads(pickle.dumps(self.store))
+        assert clone.fetch("seq2", 1, 10) == "A" * 10
+        assert clone.fetch_many([("seq1", 1, 4)]) == ["ACGT"]
+        assert clone.list_sequences() == self.store.list_sequences()
+        clone.close()
+
+
+class TestCache:
+    """Tests for the on-disk index cache."""
+    
+    def test_cache_roundtrip(self, tmp_path):
+        """Test that a cached index matches a freshly built one."""
+        built = FastaStore(str(WRAPPED_FA), cache_dir=str(tmp_path))
+        assert not built.is_cached()
+        assert built.cache_exists()
+        
+        cached = FastaStore(str(WRAPPED_FA), cache_dir=str(tmp_path))
+        assert cached.is_cached()
+        assert cached.index == built.index
+        assert cached.fetch("seq1", 50, 70) == built.fetch("seq1", 50, 70)
+    
+    def test_cache_roundtrip_empty_fasta(self, tmp_path):
+        """Test caching a FASTA without any records."""
+        path = tmp_path / "empty.fa"
+        path.write_bytes(b"")
+        FastaStore(str(path)).close()
+        
+        store = FastaStore(str(path))
+        assert store.is_cached()
+        assert store.list_sequences() == ()
+        store.close()
+    
+    def test_unchanged_cache_is_not_rewritten(self, tmp_path):
+        """Test that rebuilding an unchanged index leaves the cache file alone."""
+        store = FastaStore(str(WRAPPED_FA), cache_dir=str(tmp_path))
+        cache_file = store.get_cache_path()
+        os.utime(cache_file, ns=(1_000_000_000, 1_000_000_000))
+        
+        store.rebuild_index()
+        assert os.stat(cache_file).st_mtime_ns == 1_000_000_000
+        
+        # A truncated cache with an intact header is written again
+        with open(cache_file, "r+b") as f:
+            f.truncate(os.path.getsize(cache_file) - 1)
+        store.rebuild_index()
+        assert FastaStore(str(WRAPPED_FA), cache_dir=str(tmp_path)).is_cached()
+    
+    def test_invalid_cache_is_rebuilt(self, tmp_path):
+        """Test that an unreadable cache file falls back to rebuilding."""
+        cache_file = tmp_path / (WRAPPED_FA.name + ".fidx")
+        cache_file.write_text('{"fasta_mtime": 0, "sequences": {}}')
+        
+        store = FastaStore(str(WRAPPED_FA), cache_dir=str(tmp_path))
+        assert not store.is_cached()
+        assert store.get_length("seq1") == 180
 
 
 class TestUppercaseOutput:
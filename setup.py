@@ -2,9 +2,19 @@
 Setup script for fastaccess library.
 """
 
-from setuptools import setup, find_packages
+from setuptools import Extension, setup, find_packages
 from pathlib import Path
 
+# Optional compiled kernel; fastaccess falls back to pure Python without it
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        [Extension("fastaccess._kernels", ["fastaccess/_kernels.pyx"], optional=True)],
+        language_level=3,
+    )
+except ImportError:
+    ext_modules = []
+
 # Read README for long description
 readme_file = Path(__file__).parent / "README.md"
 long_description = readme_file.read_text(encoding="utf-8") if readme_file.exists() else ""
@@ -18,6 +28,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/fastaccess",
     packages=find_packages(exclude=["tests", "*.tests", "*.tests.*"]),
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Science/Research",
@@ -43,6 +54,9 @@ setup(
             "pytest-cov>=4.0",
             "mypy>=1.0",
         ],
+        "uring": [
+            "liburing>=2026.3.30",
+        ],
     },
     include_package_data=True,
     zip_safe=False,